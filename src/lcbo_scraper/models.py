@@ -15,14 +15,15 @@
 # ==============================================================================
 """Data models for LCBO product information."""
 
-from pydantic import BaseModel
+from dataclasses import dataclass, field
 
 
-class Product(BaseModel):
+@dataclass(slots=True)
+class Product:
     """Represents an LCBO product with scraped information."""
 
     product_number: str
     name: str | None = None
     url: str | None = None
     price: str | None = None
-    details: dict[str, str] = {}
+    details: dict[str, str] = field(default_factory=dict)
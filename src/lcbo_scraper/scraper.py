@@ -13,26 +13,127 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 # ==============================================================================
-"""LCBO website scraper using Coveo search API and BeautifulSoup."""
+"""LCBO website scraper using Coveo search API and selectolax."""
 
+import asyncio
+import concurrent.futures
+import dbm
 import logging
+import os
+import shelve
+import time
+from dataclasses import asdict
+from pathlib import Path
+from types import MappingProxyType
 
 import httpx
-from bs4 import BeautifulSoup
-from furl import furl
+import orjson
+from selectolax.lexbor import LexborCSSSelector, LexborHTMLParser
 
 from lcbo_scraper.models import Product
 
 logger = logging.getLogger(__name__)
 
+# Selector strings used on every product page, hoisted so they are not
+# rebuilt per call, and a single reusable CSS selector engine so each
+# query avoids selectolax's per-call selector setup.
+_SEL_H1 = "h1"
+_SEL_PRICE = "span.price"
+_SEL_MOREDETAIL = "div.moredetail"
+_SEL_DETAIL_ITEM = "li"
+_SEL_DETAIL_LABEL = "div.label"
+_SEL_DETAIL_VALUE = "div.value"
+_CSS = LexborCSSSelector()
+
+
+def _css_first(query: str, node):
+    """Return the first node matching a CSS query, or None.
+
+    LexborCSSSelector.find_first returns a (possibly empty) list; this
+    unwraps it to the single-node-or-None shape the scraping code wants.
+
+    Args:
+        query: CSS selector string.
+        node: The LexborNode to search under.
+
+    Returns:
+        The first matching LexborNode, or None if nothing matched.
+    """
+    matches = _CSS.find_first(query, node)
+    return matches[0] if matches else None
+
 # Coveo API configuration (extracted from LCBO website)
 COVEO_API_URL = "https://platform.cloud.coveo.com/rest/search/v2"
 COVEO_ORG_ID = "lcboproductionx2kwygnc"
 COVEO_ACCESS_TOKEN = "xx883b5583-07fb-416b-874b-77cce565d927"
 
+# The search endpoint's query string never varies, so build it once
+# rather than round-tripping through a URL builder per request.
+_COVEO_URL = f"{COVEO_API_URL}?organizationId={COVEO_ORG_ID}"
+
+# Static request pieces for the search endpoint, built once instead of
+# per call. Only "q" (and, for batches, "numberOfResults") varies.
+_COVEO_HEADERS = MappingProxyType(
+    {
+        "Authorization": f"Bearer {COVEO_ACCESS_TOKEN}",
+        "Content-Type": "application/json",
+    }
+)
+_COVEO_PAYLOAD_BASE = MappingProxyType(
+    {
+        "numberOfResults": 10,
+        "sortCriteria": "relevancy",
+        "searchHub": "Web_Main_Search_EN",
+        "locale": "en-CA",
+        "tab": "Products",
+        "fieldsToInclude": [
+            "clickUri",
+            "ec_name",
+            "ec_price",
+            "ec_skus",
+        ],
+        "aq": "@ec_visibility==(3,4)",
+    }
+)
+
 # LCBO base URL
 LCBO_BASE_URL = "https://www.lcbo.com"
 
+# Wholesale-to-consumer URL rewrite, hoisted so the literals are built
+# once rather than per normalized URL.
+_WHOLESALE_PREFIX = "wholesale.lcbo.com/b2b_en/"
+_CONSUMER_PREFIX = "www.lcbo.com/en/"
+
+# On-disk product cache: repeat lookups of the same product number
+# within the TTL skip the network entirely.
+CACHE_DIR = Path.home() / ".cache" / "lcbo-scraper"
+CACHE_TTL = 6 * 60 * 60  # seconds; prices go stale faster than names
+
+# Cap on in-flight product lookups, overridable via LCBO_CONCURRENCY or
+# the --concurrency flag. Unbounded gather over a large -n list would
+# open every socket at once and invite server-side throttling.
+DEFAULT_CONCURRENCY = 16
+
+# Status codes that mean "slow down"; retried once after a pause.
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def _retry_after_seconds(response: httpx.Response, default: float = 1.0) -> float:
+    """Return the Retry-After delay from a throttled response.
+
+    Args:
+        response: The 429/503 response.
+        default: Delay to use when the header is missing or is an
+            HTTP-date rather than a number of seconds.
+
+    Returns:
+        Delay in seconds, never negative.
+    """
+    try:
+        return max(float(response.headers.get("Retry-After", default)), 0.0)
+    except ValueError:
+        return default
+
 
 def normalize_product_url(url: str) -> str:
     """Normalize a product URL to the consumer website.
@@ -49,80 +150,226 @@ def normalize_product_url(url: str) -> str:
     # Convert wholesale URLs to consumer URLs
     # wholesale: https://wholesale.lcbo.com/b2b_en/product-name-12345
     # consumer:  https://www.lcbo.com/en/product-name-12345
-    if "wholesale.lcbo.com/b2b_en/" in url:
-        url = url.replace("wholesale.lcbo.com/b2b_en/", "www.lcbo.com/en/")
-    return url
+    # str.replace no-ops when the needle is absent, so a single scan
+    # suffices; no membership check needed.
+    return url.replace(_WHOLESALE_PREFIX, _CONSUMER_PREFIX, 1)
+
+
+def _parse_product_html(html: bytes, product_number: str, url: str) -> Product:
+    """Parse a product page's HTML into a Product.
+
+    Top-level (rather than a method) so it can be pickled across to
+    process-pool workers; takes plain bytes/strings for the same reason.
+    Both parsers consume the raw bytes directly, so the page never pays
+    an httpx bytes-to-str decode pass.
+
+    Args:
+        html: The product page HTML, as raw bytes.
+        product_number: The product number being searched.
+        url: The product page URL.
+
+    Returns:
+        A Product instance with scraped information.
+    """
+    product = Product(product_number=product_number, url=url)
+
+    tree = LexborHTMLParser(html)
+
+    # Extract product name from h1
+    h1 = _css_first(_SEL_H1, tree.root)
+    if h1:
+        product.name = h1.text(strip=True)
+
+    # Extract price - look for span with class "price"
+    # The page has nested spans: span.price-wrapper > span.price
+    # We want the innermost span.price that contains just the price
+    for price_span in _CSS.find(_SEL_PRICE, tree.root):
+        # Skip if this span contains spans at any depth (it's a
+        # wrapper). traverse() yields the node itself first, so drop
+        # that before looking for span descendants.
+        descendants = price_span.traverse()
+        next(descendants, None)
+        if any(node.tag == "span" for node in descendants):
+            continue
+        price_text = price_span.text(strip=True)
+        # Only take price if it starts with $ (valid price format)
+        if price_text.startswith("$"):
+            product.price = price_text
+            break
+
+    # Extract More Details from the moredetail section
+    # Structure: <div class="moredetail"><ul><li><div class="label">Key</div><div class="value">Value</div></li></ul></div>
+    details = {}
+
+    moredetail = _css_first(_SEL_MOREDETAIL, tree.root)
+    if moredetail:
+        for li in _CSS.find(_SEL_DETAIL_ITEM, moredetail):
+            label_div = _css_first(_SEL_DETAIL_LABEL, li)
+            value_div = _css_first(_SEL_DETAIL_VALUE, li)
+            if label_div and value_div:
+                key = label_div.text(strip=True)
+                value = value_div.text(strip=True)
+                if key and value:
+                    details[key] = value
+
+    # Fallback: try dt/dd structure (rare enough that BeautifulSoup's
+    # sibling traversal is fine here; imported lazily to keep it off
+    # the hot path). A SoupStrainer keeps the parse restricted to the
+    # dt/dd tags instead of building the whole document tree.
+    if not details:
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        soup = BeautifulSoup(html, "lxml", parse_only=SoupStrainer(["dt", "dd"]))
+        for dt in soup.find_all("dt"):
+            dd = dt.find_next_sibling("dd")
+            if dd:
+                key = dt.get_text(strip=True)
+                value = dd.get_text(strip=True)
+                if key and value:
+                    details[key] = value
+
+    product.details = details
+
+    return product
 
 
 class LcboScraper:
-    """Scraper for LCBO website products."""
+    """Scraper for LCBO website products.
+
+    All requests share a single async HTTPX client, so products can be
+    scraped concurrently with ``asyncio.gather``.
+    """
+
+    def __init__(self, refresh: bool = False, concurrency: int | None = None) -> None:
+        """Initialize the scraper with an async HTTPX client.
 
-    def __init__(self) -> None:
-        """Initialize the scraper with an HTTPX client."""
-        self.client = httpx.Client(
-            timeout=30.0,
+        Args:
+            refresh: When True, ignore cached products and re-scrape.
+                Fresh results are still written back to the cache.
+            concurrency: Maximum number of in-flight product lookups.
+                Defaults to the LCBO_CONCURRENCY environment variable,
+                or 16.
+        """
+        self.refresh = refresh
+        if concurrency is None:
+            concurrency = int(os.getenv("LCBO_CONCURRENCY", str(DEFAULT_CONCURRENCY)))
+        self._sem = asyncio.Semaphore(concurrency)
+        self._cache: shelve.Shelf | None = None
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._cache = shelve.open(str(CACHE_DIR / "products"))
+        except dbm.error as e:
+            # dbm.error is a tuple that includes OSError, and also
+            # covers a corrupt or foreign-backend cache file.
+            logger.warning("Could not open product cache, continuing without: %s", e)
+        # Page parsing is GIL-bound; a process pool keeps it off the
+        # event loop and spreads it across cores.
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+        self.client = httpx.AsyncClient(
+            # An explicit transport so connect failures (DNS, TLS) are
+            # retried inside httpx instead of bubbling up per product.
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(
+                    max_connections=64,
+                    max_keepalive_connections=32,
+                    keepalive_expiry=30.0,
+                ),
+            ),
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0),
             headers={
                 "User-Agent": (
                     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                     "AppleWebKit/537.36 (KHTML, like Gecko) "
                     "Chrome/120.0.0.0 Safari/537.36"
                 ),
+                # Ask for compressed bodies (httpx decodes transparently);
+                # smaller transfers also mean less text handed to the parser.
+                "Accept-Encoding": "br, gzip, deflate",
             },
         )
 
-    def __enter__(self) -> "LcboScraper":
-        """Context manager entry."""
+    async def __aenter__(self) -> "LcboScraper":
+        """Async context manager entry.
+
+        Warms up pooled connections to both hosts so the first real
+        request doesn't serialize behind a TCP+TLS handshake; the two
+        handshakes overlap each other instead.
+        """
+        await asyncio.gather(
+            self.client.head(COVEO_API_URL),
+            self.client.head(LCBO_BASE_URL),
+            return_exceptions=True,
+        )
         return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Context manager exit - close the client."""
-        self.close()
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Async context manager exit - close the client."""
+        await self.close()
 
-    def close(self) -> None:
-        """Close the httpx client."""
-        self.client.close()
+    async def close(self) -> None:
+        """Close the httpx client, the parse pool, and the product cache."""
+        await self.client.aclose()
+        self._pool.shutdown()
+        if self._cache is not None:
+            self._cache.close()
 
-    def search_product(self, product_number: str) -> str | None:
-        """Search for a product by number using Coveo API.
+    def _cache_get(self, product_number: str) -> Product | None:
+        """Return a cached Product if present and not expired.
 
         Args:
-            product_number: The LCBO product number to search for.
+            product_number: The LCBO product number.
 
         Returns:
-            The product page URL if found, None otherwise.
+            The cached Product, or None on miss, expiry, or when the
+            cache is disabled.
         """
-        headers = {
-            "Authorization": f"Bearer {COVEO_ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
+        if self._cache is None or self.refresh:
+            return None
+        entry = self._cache.get(product_number)
+        if entry is None or time.time() - entry["saved_at"] > CACHE_TTL:
+            return None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cache hit for product: %s", product_number)
+        return Product(**entry["product"])
 
-        payload = {
-            "q": product_number,
-            "numberOfResults": 10,
-            "sortCriteria": "relevancy",
-            "searchHub": "Web_Main_Search_EN",
-            "locale": "en-CA",
-            "tab": "Products",
-            "fieldsToInclude": [
-                "clickUri",
-                "ec_name",
-                "ec_price",
-                "ec_skus",
-            ],
-            "aq": "@ec_visibility==(3,4)",
+    def _cache_put(self, product: Product) -> None:
+        """Store a scraped Product in the cache.
+
+        Products that were never found (no name) are not cached, so a
+        later run retries them.
+
+        Args:
+            product: The Product to cache.
+        """
+        if self._cache is None or not product.name:
+            return
+        self._cache[product.product_number] = {
+            "saved_at": time.time(),
+            "product": asdict(product),
         }
 
-        url = furl(COVEO_API_URL)
-        url.args["organizationId"] = COVEO_ORG_ID
+    async def search_product(self, product_number: str) -> dict | None:
+        """Search for a product by number using Coveo API.
+
+        Args:
+            product_number: The LCBO product number to search for.
+
+        Returns:
+            The Coveo result dict (including ``clickUri`` and ``raw``
+            fields) if found, None otherwise.
+        """
+        payload = {**_COVEO_PAYLOAD_BASE, "q": product_number}
 
         try:
-            response = self.client.post(
-                str(url),
-                headers=headers,
-                json=payload,
+            response = await self.client.post(
+                _COVEO_URL,
+                headers=_COVEO_HEADERS,
+                content=orjson.dumps(payload),
             )
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
             results = data.get("results", [])
             if not results:
@@ -136,19 +383,19 @@ class LcboScraper:
 
                 # Check if product number matches SKU or is in URL
                 if product_number in ec_skus or product_number in click_uri:
-                    normalized_url = normalize_product_url(click_uri)
-                    logger.debug("Found product URL: %s", normalized_url)
-                    return normalized_url
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Found product: %s", click_uri)
+                    return result
 
             # If no exact match, return first result
             first_result = results[0]
-            click_uri = first_result.get("clickUri")
-            if click_uri:
-                normalized_url = normalize_product_url(click_uri)
-                logger.debug(
-                    "No exact match, using first result: %s", normalized_url
-                )
-                return normalized_url
+            if first_result.get("clickUri"):
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "No exact match, using first result: %s",
+                        first_result["clickUri"],
+                    )
+                return first_result
 
             logger.warning(
                 "No product URL found in results for: %s", product_number
@@ -166,9 +413,102 @@ class LcboScraper:
             )
             return None
 
-    def scrape_product_page(self, url: str, product_number: str) -> Product:
+    async def search_products(self, product_numbers: list[str]) -> dict[str, dict | None]:
+        """Search for several products with a single Coveo query.
+
+        Batches all product numbers into one POST instead of one
+        round-trip per number. Numbers the on-disk cache can satisfy are
+        left out of the query entirely (they map to None, and
+        :meth:`get_product` serves them from the cache without touching
+        the network), so a fully cached repeat run sends no search at
+        all. Results are mapped back to the requested numbers by SKU or
+        URL match; numbers the batch could not resolve map to None, and
+        callers can fall back to :meth:`search_product` for those.
+
+        Args:
+            product_numbers: The LCBO product numbers to search for.
+
+        Returns:
+            Mapping of product number to the Coveo result dict (or None
+            if the number is cached or the batch search found no match).
+        """
+        matches: dict[str, dict | None] = dict.fromkeys(product_numbers)
+
+        pending = [n for n in product_numbers if self._cache_get(n) is None]
+        if not pending:
+            return matches
+
+        payload = {
+            **_COVEO_PAYLOAD_BASE,
+            "q": " OR ".join(pending),
+            "numberOfResults": len(pending) * 5,
+        }
+
+        try:
+            response = await self.client.post(
+                _COVEO_URL,
+                headers=_COVEO_HEADERS,
+                content=orjson.dumps(payload),
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        except httpx.HTTPStatusError as e:
+            logger.error("HTTP error in batch product search: %s", e)
+            return matches
+        except httpx.RequestError as e:
+            logger.error("Request error in batch product search: %s", e)
+            return matches
+
+        results = data.get("results", [])
+        claimed: set[int] = set()
+
+        # First pass: exact SKU membership only. The URL check is a
+        # substring heuristic, and with every requested number's results
+        # in one pool a short number could claim a longer number's URL
+        # (e.g. "123" matching "...-1234") before its own exact result
+        # is reached.
+        for index, result in enumerate(results):
+            ec_skus = result.get("raw", {}).get("ec_skus", [])
+            for product_number in pending:
+                if matches[product_number] is None and product_number in ec_skus:
+                    matches[product_number] = result
+                    claimed.add(index)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Batch search found %s: %s",
+                            product_number,
+                            result.get("clickUri", ""),
+                        )
+                    break
+
+        # Second pass: fall back to the URL-substring heuristic for
+        # numbers the SKU pass could not resolve, skipping results
+        # already claimed by an exact match.
+        for index, result in enumerate(results):
+            if index in claimed:
+                continue
+            click_uri = result.get("clickUri", "")
+            for product_number in pending:
+                if matches[product_number] is None and product_number in click_uri:
+                    matches[product_number] = result
+                    claimed.add(index)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Batch search found %s by URL: %s",
+                            product_number,
+                            click_uri,
+                        )
+                    break
+
+        return matches
+
+    async def scrape_product_page(self, url: str, product_number: str) -> Product:
         """Scrape product information from a product page.
 
+        The fetch happens on the event loop; the CPU-bound parse is
+        dispatched to the process pool so the loop stays free to reap
+        other responses.
+
         Args:
             url: The product page URL.
             product_number: The product number being searched.
@@ -176,80 +516,81 @@ class LcboScraper:
         Returns:
             A Product instance with scraped information.
         """
-        product = Product(product_number=product_number, url=url)
-
         try:
-            response = self.client.get(url)
+            response = await self.client.get(url)
+            if response.status_code in _THROTTLE_STATUSES:
+                delay = _retry_after_seconds(response)
+                logger.warning(
+                    "Throttled fetching %s, retrying in %.1fs", url, delay
+                )
+                await asyncio.sleep(delay)
+                response = await self.client.get(url)
             response.raise_for_status()
         except httpx.HTTPStatusError as e:
             logger.error("HTTP error fetching product page %s: %s", url, e)
-            return product
+            return Product(product_number=product_number, url=url)
         except httpx.RequestError as e:
             logger.error("Request error fetching product page %s: %s", url, e)
-            return product
-
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract product name from h1
-        h1 = soup.find("h1")
-        if h1:
-            product.name = h1.get_text(strip=True)
-
-        # Extract price - look for span with class "price"
-        # The page has nested spans: span.price-wrapper > span.price
-        # We want the innermost span.price that contains just the price
-        price_spans = soup.find_all("span", class_="price")
-        for price_span in price_spans:
-            # Skip if this span contains child spans (it's a wrapper)
-            if price_span.find("span"):
-                continue
-            price_text = price_span.get_text(strip=True)
-            # Only take price if it starts with $ (valid price format)
-            if price_text.startswith("$"):
-                product.price = price_text
-                break
-
-        # Extract More Details from the moredetail section
-        # Structure: <div class="moredetail"><ul><li><div class="label">Key</div><div class="value">Value</div></li></ul></div>
-        details = {}
-
-        moredetail = soup.find("div", class_="moredetail")
-        if moredetail:
-            for li in moredetail.find_all("li"):
-                label_div = li.find("div", class_="label")
-                value_div = li.find("div", class_="value")
-                if label_div and value_div:
-                    key = label_div.get_text(strip=True)
-                    value = value_div.get_text(strip=True)
-                    if key and value:
-                        details[key] = value
-
-        # Fallback: try dt/dd structure
-        if not details:
-            for dt in soup.find_all("dt"):
-                dd = dt.find_next_sibling("dd")
-                if dd:
-                    key = dt.get_text(strip=True)
-                    value = dd.get_text(strip=True)
-                    if key and value:
-                        details[key] = value
-
-        product.details = details
+            return Product(product_number=product_number, url=url)
 
-        return product
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pool, _parse_product_html, response.content, product_number, url
+        )
 
-    def get_product(self, product_number: str) -> Product:
+    async def get_product(
+        self,
+        product_number: str,
+        result: dict | None = None,
+        details: bool = True,
+    ) -> Product:
         """Search for and scrape a product by number.
 
         Args:
             product_number: The LCBO product number.
+            result: Coveo search result, if already resolved by a batch
+                search. When omitted, the product is searched for
+                individually.
+            details: Whether the "More Details" fields are needed. When
+                False and the search result already carries a name, the
+                product is built from the Coveo fields and the page
+                fetch and parse are skipped entirely.
 
         Returns:
             A Product instance with all available information.
         """
-        url = self.search_product(product_number)
-        if not url:
-            logger.warning("Product not found: %s", product_number)
-            return Product(product_number=product_number)
-
-        return self.scrape_product_page(url, product_number)
+        cached = self._cache_get(product_number)
+        if cached is not None:
+            return cached
+
+        # The semaphore bounds in-flight lookups so a large batch
+        # doesn't open every socket at once and trip rate limiting.
+        async with self._sem:
+            if result is None:
+                result = await self.search_product(product_number)
+            if not result:
+                logger.warning("Product not found: %s", product_number)
+                return Product(product_number=product_number)
+
+            url = normalize_product_url(result.get("clickUri", ""))
+
+            if not details:
+                raw = result.get("raw", {})
+                name = raw.get("ec_name")
+                if name:
+                    price = raw.get("ec_price")
+                    if price is not None and not isinstance(price, str):
+                        price = f"${price:.2f}"
+                    return Product(
+                        product_number=product_number,
+                        url=url or None,
+                        name=name,
+                        price=price,
+                    )
+
+            if not url:
+                logger.warning("Product not found: %s", product_number)
+                return Product(product_number=product_number)
+
+            product = await self.scrape_product_page(url, product_number)
+        self._cache_put(product)
+        return product